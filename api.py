@@ -1,38 +1,401 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Body
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Body, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-import tempfile
-import os
-from pathlib import Path
-from food_aesthetics.model import FoodAesthetics
+from fastapi.concurrency import run_in_threadpool
+from starlette.formparsers import MultiPartParser
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from food_aesthetics.model import FoodAesthetics, INPUT_SIZE
 import uvicorn
-import base64
+import pybase64
 import io
+import os
+import asyncio
+import threading
+import platform
+import xxhash
+from collections import OrderedDict
+from typing import List
 from PIL import Image
 import numpy as np
 
+# Created per worker process by the lifespan hook below, never at import
+# time: with several workers, multiprocessing re-imports this module in the
+# parent and in every child, and each import would load another model copy
+fa_model = None
+decode_pool = None
+
+def _worker_count():
+    """Number of uvicorn worker processes sharing this host (WORKERS, default 1)"""
+    return max(1, int(os.environ.get("WORKERS", "1")))
+
+@asynccontextmanager
+async def lifespan(app):
+    """Load the model and the decode pool once per worker process"""
+    global fa_model, decode_pool
+    
+    try:
+        fa_model = FoodAesthetics()
+        fa_model.warmup()
+        print("✅ Food Aesthetics model loaded successfully!")
+    except Exception as e:
+        print(f"❌ Error loading model: {e}")
+        fa_model = None
+    
+    # Pool for decoding batch images off the event loop; the cores are split
+    # between workers so the total thread count stays around the CPU count
+    decode_pool = ThreadPoolExecutor(max_workers=max(1, (os.cpu_count() or 1) // _worker_count()))
+    
+    yield
+    
+    decode_pool.shutdown(wait=False)
+
 app = FastAPI(
     title="Food Aesthetics API",
     description="API for scoring food images based on aesthetic quality",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Add CORS middleware for browser clients; service-to-service deployments
+# can skip it entirely with DISABLE_CORS=1
+if os.environ.get("DISABLE_CORS", "").lower() not in ("1", "true", "yes"):
+    allowed_origins = [
+        origin.strip()
+        for origin in os.environ.get("ALLOWED_ORIGINS", "http://localhost:3000").split(",")
+        if origin.strip()
+    ]
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=allowed_origins,
+        allow_credentials=True,
+        allow_methods=["GET", "POST"],
+        allow_headers=["Content-Type", "Authorization"],
+        max_age=86400,  # let browsers cache preflight responses for a day
+    )
 
-# Initialize the model globally
+# libjpeg-turbo decoder for JPEG inputs; Pillow handles everything else
 try:
-    fa_model = FoodAesthetics()
-    print("✅ Food Aesthetics model loaded successfully!")
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJCS_CMYK, TJCS_YCCK
+    jpeg_decoder = TurboJPEG()
 except Exception as e:
-    print(f"❌ Error loading model: {e}")
-    fa_model = None
+    print(f"⚠️ TurboJPEG unavailable, decoding JPEGs with Pillow: {e}")
+    jpeg_decoder = None
+
+def _cpu_flags():
+    """Return the CPU feature flags reported by /proc/cpuinfo (empty if unavailable)"""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                # x86 reports "flags", ARM reports "Features"
+                if line.startswith(("flags", "Features")):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+SIMD_FEATURES = ("sse4_2", "avx2", "avx512f", "avx512bw", "avx512vbmi", "asimd")
+
+def _simd_report():
+    """Describe which SIMD code paths the base64 and JPEG decoders can use"""
+    flags = _cpu_flags()
+    return {
+        "machine": platform.machine(),
+        "cpu_simd": [feature for feature in SIMD_FEATURES if feature in flags],
+        "pybase64": pybase64.get_version(),
+        "jpeg_decoder": "libjpeg-turbo" if jpeg_decoder is not None else "pillow"
+    }
+
+# Log the active SIMD paths so deployments on downgraded hosts are noticed
+simd_info = _simd_report()
+print(f"🧮 SIMD: {simd_info}")
+if simd_info["machine"].lower() in ("x86_64", "amd64") and "avx2" not in simd_info["cpu_simd"]:
+    print("⚠️ AVX2 not available, base64 and JPEG decoding will use slower code paths")
+if "C extension active" not in simd_info["pybase64"]:
+    print("⚠️ pybase64 C extension not active, base64 decoding falls back to pure Python")
+
+JPEG_MAGIC = b'\xff\xd8\xff'
+PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+IMAGE_MAGIC = {"jpeg": JPEG_MAGIC, "jpg": JPEG_MAGIC, "png": PNG_MAGIC}
+
+# Largest accepted base64 string (~15MB decoded) and raw image body
+MAX_BASE64_LENGTH = 20 * 1024 * 1024
+MAX_IMAGE_BYTES = MAX_BASE64_LENGTH // 4 * 3
+
+# Keep multipart uploads up to 8MB in memory instead of spooling them to disk.
+# Starlette has no public setting for this: MultiPartParser.max_file_size is
+# the spool threshold in the Starlette 0.27 series pinned in
+# api_requirements.txt. Re-check this line before bumping that pin.
+if hasattr(MultiPartParser, "max_file_size"):
+    MultiPartParser.max_file_size = 8 * 1024 * 1024
+else:
+    print("⚠️ MultiPartParser.max_file_size not found, uploads over 1MB will spool to disk")
+
+# Batches are scored with a single forward pass
+MAX_BATCH_SIZE = 32
+
+class ScoreCache:
+    """Thread-safe LRU cache of scores keyed by a 64-bit hash of the image bytes"""
+    
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Return the cached (score, (width, height)) entry or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+    
+    def put(self, key, entry):
+        """Insert an entry, evicting the least recently used one when full"""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+# Repeated images (retries, the same menu photo) skip decode and inference
+score_cache = ScoreCache(maxsize=int(os.environ.get("SCORE_CACHE_SIZE", "4096")))
+
+def _jpeg_scaling_factor(width, height):
+    """
+    Pick the smallest libjpeg-turbo scale that keeps the shortest side >= INPUT_SIZE
+    
+    Only downscaling factors are considered: smaller images decode at 1/1
+    rather than being enlarged inside the IDCT and shrunk again afterwards.
+    """
+    shortest = min(width, height)
+    candidates = [
+        (num, denom) for num, denom in jpeg_decoder.scaling_factors
+        if num <= denom and shortest * num / denom >= INPUT_SIZE
+    ]
+    if not candidates:
+        return (1, 1)
+    return min(candidates, key=lambda factor: factor[0] / factor[1])
+
+def _decode_jpeg_turbo(image_bytes):
+    """
+    Decode a JPEG with libjpeg-turbo, downscaling it during decode
+    
+    Returns:
+        Tuple of (RGB array, (original width, original height)), or None when
+        libjpeg-turbo cannot produce RGB (CMYK/YCCK JPEGs, corrupt headers)
+        and the caller should fall back to Pillow
+    """
+    try:
+        width, height, _, colorspace = jpeg_decoder.decode_header(image_bytes)
+        if colorspace in (TJCS_CMYK, TJCS_YCCK):
+            return None
+        
+        image_array = jpeg_decoder.decode(
+            image_bytes, pixel_format=TJPF_RGB, scaling_factor=_jpeg_scaling_factor(width, height)
+        )
+    except Exception:
+        return None
+    
+    return image_array, (width, height)
+
+def _decode_image(image_bytes):
+    """
+    Decode image bytes into an RGB uint8 array of shape H x W x 3
+    
+    JPEGs are downscaled during decode when they are much larger than the
+    model input, so the returned array may be smaller than the original.
+    
+    Returns:
+        Tuple of (RGB array, (original width, original height))
+    """
+    if jpeg_decoder is not None and image_bytes[:3] == JPEG_MAGIC:
+        decoded = _decode_jpeg_turbo(image_bytes)
+        if decoded is not None:
+            return decoded
+    
+    image = Image.open(io.BytesIO(image_bytes))
+    size = image.size
+    
+    # Let libjpeg decode straight to RGB at a reduced scale (no-op for non-JPEGs)
+    image.draft('RGB', (INPUT_SIZE, INPUT_SIZE))
+    
+    # Convert to RGB if necessary
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    
+    return np.asarray(image, dtype=np.uint8), size
+
+def _check_base64_image(image_data, image_format):
+    """
+    Reject oversize or mislabelled base64 images before decoding them
+    
+    Only the length and the first few decoded bytes are inspected, so bad
+    input is refused without allocating the full decoded buffer.
+    """
+    if len(image_data) > MAX_BASE64_LENGTH:
+        raise HTTPException(status_code=413, detail=f"Image data exceeds {MAX_BASE64_LENGTH} base64 characters")
+    
+    magic = IMAGE_MAGIC.get(image_format.lower())
+    if magic is None:
+        return
+    
+    try:
+        head = pybase64.b64decode(image_data[:24], validate=False)
+    except ValueError:
+        head = b''
+    
+    if not head.startswith(magic):
+        raise HTTPException(status_code=415, detail=f"Image data is not a valid {image_format} image")
+
+def _image_key(image_bytes):
+    """Fast content hash used as the score cache key"""
+    return xxhash.xxh3_64_intdigest(image_bytes)
+
+async def _read_image_body(request):
+    """
+    Read a raw image request body, refusing it once it exceeds MAX_IMAGE_BYTES
+    
+    Oversize bodies are rejected from Content-Length before anything is read;
+    without it, the stream is read until the running total passes the cap.
+    """
+    too_large = HTTPException(status_code=413, detail=f"Image exceeds {MAX_IMAGE_BYTES} bytes")
+    
+    content_length = request.headers.get("content-length")
+    if content_length is not None:
+        try:
+            if int(content_length) > MAX_IMAGE_BYTES:
+                raise too_large
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Content-Length header")
+    
+    # Collect the chunks and join them once, a single copy of the upload
+    chunks = []
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > MAX_IMAGE_BYTES:
+            raise too_large
+        chunks.append(chunk)
+    
+    return b"".join(chunks)
+
+def _score_result(score, image_format, size):
+    """Build the per-image response fields"""
+    width, height = size
+    return {
+        "aesthetic_score": float(score),
+        "image_format": image_format,
+        "image_size": f"{width}x{height}"
+    }
+
+def _prepare_image(image_bytes):
+    """
+    Look an image up in the score cache, decoding it only on a miss
+    
+    The decoded pixels are resized to the model input right away, in the
+    same worker thread, so only the small resized array is kept around.
+    
+    Returns:
+        Tuple of (cache key, cached entry or None, (resized array, size) or None)
+    """
+    key = _image_key(image_bytes)
+    cached = score_cache.get(key)
+    if cached is not None:
+        return key, cached, None
+    
+    image_array, size = _decode_image(image_bytes)
+    return key, None, (fa_model.resize_array(image_array), size)
+
+def _prepare_base64_image(image_data):
+    """Decode a base64 image string and prepare it for scoring"""
+    return _prepare_image(pybase64.b64decode(image_data, validate=False))
+
+def _score_sync(payload, image_format, prepare=_prepare_image):
+    """
+    Decode and score one image; runs in a worker thread
+    
+    Args:
+        payload: Image bytes, or a base64 string with prepare=_prepare_base64_image
+        image_format: Image format reported back in the result
+        prepare: Function turning the payload into a (key, cached, image) tuple
+    """
+    key, cached, image = prepare(payload)
+    
+    if cached is None:
+        photo, size = image
+        cached = (float(fa_model.aesthetic_score_resized([photo])[0]), size)
+        score_cache.put(key, cached)
+    
+    score, size = cached
+    return _score_result(score, image_format, size)
+
+async def _score_batch(jobs, prepare):
+    """
+    Decode images concurrently and score them with one batched forward pass
+    
+    Args:
+        jobs: List of (image_index, image_format, payload) tuples
+        prepare: Function turning a payload into a (key, cached, image) tuple
+    
+    Returns:
+        List of per-image results ordered by image index
+    """
+    results = []
+    pending = []
+    
+    # Hash and decode all images concurrently on the shared pool
+    loop = asyncio.get_running_loop()
+    prepared = await asyncio.gather(
+        *[loop.run_in_executor(decode_pool, prepare, payload) for _, _, payload in jobs],
+        return_exceptions=True
+    )
+    
+    for (i, image_format, _), item in zip(jobs, prepared):
+        if isinstance(item, Exception):
+            results.append({
+                "image_index": i,
+                "error": f"Failed to process image: {str(item)}"
+            })
+            continue
+        
+        key, cached, image = item
+        if cached is not None:
+            score, size = cached
+            results.append({"image_index": i, **_score_result(score, image_format, size)})
+        else:
+            pending.append((i, image_format, key, image))
+    
+    # Score all cache misses in one batched call
+    if pending:
+        scores = await run_in_threadpool(
+            fa_model.aesthetic_score_resized, [photo for _, _, _, (photo, _) in pending]
+        )
+        
+        for (i, image_format, key, (_, size)), score in zip(pending, scores):
+            score_cache.put(key, (float(score), size))
+            results.append({"image_index": i, **_score_result(score, image_format, size)})
+    
+    results.sort(key=lambda r: r["image_index"])
+    return results
 
 @app.get("/")
 async def root():
@@ -43,7 +406,11 @@ async def root():
         "endpoints": {
             "/score": "POST - Send image data and get aesthetic score",
             "/score-batch": "POST - Send multiple images for batch scoring",
-            "/health": "GET - Check API health and model status"
+            "/score-raw": "POST - Send raw image bytes and get aesthetic score",
+            "/score-file": "POST - Upload an image file and get aesthetic score",
+            "/score-batch-file": "POST - Upload multiple image files for batch scoring",
+            "/health": "GET - Check API health and model status",
+            "/cache/stats": "GET - Score cache size and hit rate"
         }
     }
 
@@ -56,9 +423,15 @@ async def health_check():
     return {
         "status": "healthy",
         "model_loaded": True,
+        "simd": simd_info,
         "message": "Food Aesthetics model is ready"
     }
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Score cache statistics for tuning SCORE_CACHE_SIZE"""
+    return score_cache.stats()
+
 @app.post("/score")
 async def score_image(
     image_data: str = Body(..., description="Base64 encoded image data"),
@@ -67,6 +440,9 @@ async def score_image(
     """
     Send image data (base64 encoded) and get aesthetic score
     
+    Deprecated for service-to-service calls: base64 inflates the payload by a
+    third and costs an extra encode/decode. Prefer `/score-raw` or `/score-file`.
+    
     Args:
         image_data: Base64 encoded image string
         image_format: Image format (jpeg, png, etc.)
@@ -77,43 +453,63 @@ async def score_image(
     if fa_model is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
     
+    _check_base64_image(image_data, image_format)
+    
     try:
-        # Decode base64 image data
-        image_bytes = base64.b64decode(image_data)
-        
-        # Create PIL Image from bytes
-        image = Image.open(io.BytesIO(image_bytes))
-        
-        # Convert to RGB if necessary
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
+        # Decode base64, decode and score in a worker thread so the event
+        # loop stays free
+        result = await run_in_threadpool(_score_sync, image_data, image_format, _prepare_base64_image)
         
-        # Save to temporary file for the model
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{image_format}") as temp_file:
-            image.save(temp_file, format=image_format.upper())
-            temp_file_path = temp_file.name
-        
-        # Get the aesthetic score
-        score = fa_model.aesthetic_score(temp_file_path)
+        return ORJSONResponse({
+            **result,
+            "message": "Image scored successfully"
+        })
         
-        # Clean up the temporary file
-        os.unlink(temp_file_path)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
+
+@app.post(
+    "/score-raw",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "image/jpeg": {"schema": {"type": "string", "format": "binary"}},
+                "image/png": {"schema": {"type": "string", "format": "binary"}}
+            }
+        }
+    }
+)
+async def score_image_raw(request: Request):
+    """
+    Send raw image bytes as the request body and get aesthetic score
+    
+    Fastest path for service-to-service calls: no JSON parsing, no base64
+    and no multipart framing. The image format is taken from the
+    Content-Type header (e.g. `image/jpeg`).
+    
+    Returns:
+        JSON with aesthetic score
+    """
+    if fa_model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    image_bytes = await _read_image_body(request)
+    if not image_bytes:
+        raise HTTPException(status_code=400, detail="Empty request body")
+    
+    content_type = request.headers.get("content-type", "image/jpeg")
+    image_format = content_type.split(";")[0].strip().split("/")[-1]
+    
+    try:
+        result = await run_in_threadpool(_score_sync, image_bytes, image_format)
         
-        return JSONResponse({
-            "aesthetic_score": float(score),
-            "image_format": image_format,
-            "image_size": f"{image.width}x{image.height}",
+        return ORJSONResponse({
+            **result,
             "message": "Image scored successfully"
         })
         
     except Exception as e:
-        # Clean up temp file if it exists
-        if 'temp_file_path' in locals():
-            try:
-                os.unlink(temp_file_path)
-            except:
-                pass
-        
         raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
 
 @app.post("/score-batch")
@@ -123,6 +519,9 @@ async def score_batch_images(
     """
     Send multiple images (base64 encoded) and get aesthetic scores
     
+    Deprecated for service-to-service calls: base64 inflates the payload by a
+    third and costs an extra encode/decode. Prefer `/score-batch-file`.
+    
     Args:
         images: List of objects with 'image_data' and 'image_format' fields
     
@@ -135,13 +534,12 @@ async def score_batch_images(
     if len(images) == 0:
         raise HTTPException(status_code=400, detail="No images provided")
     
-    if len(images) > 10:
-        raise HTTPException(status_code=400, detail="Maximum 10 images allowed per batch")
-    
-    results = []
-    temp_files = []
+    if len(images) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_BATCH_SIZE} images allowed per batch")
     
     try:
+        jobs = []
+        rejected = []
         for i, img_obj in enumerate(images):
             if not isinstance(img_obj, dict) or 'image_data' not in img_obj:
                 continue  # Skip invalid image objects
@@ -149,47 +547,22 @@ async def score_batch_images(
             image_data = img_obj.get('image_data', '')
             image_format = img_obj.get('image_format', 'jpeg')
             
+            if not isinstance(image_data, str) or not isinstance(image_format, str):
+                rejected.append({"image_index": i, "error": "image_data and image_format must be strings"})
+                continue
+            
             try:
-                # Decode base64 image data
-                image_bytes = base64.b64decode(image_data)
-                
-                # Create PIL Image from bytes
-                image = Image.open(io.BytesIO(image_bytes))
-                
-                # Convert to RGB if necessary
-                if image.mode != 'RGB':
-                    image = image.convert('RGB')
-                
-                # Save to temporary file
-                with tempfile.NamedTemporaryFile(delete=False, suffix=f".{image_format}") as temp_file:
-                    image.save(temp_file, format=image_format.upper())
-                    temp_file_path = temp_file.name
-                    temp_files.append(temp_file_path)
-                
-                # Get aesthetic score
-                score = fa_model.aesthetic_score(temp_file_path)
-                
-                results.append({
-                    "image_index": i,
-                    "aesthetic_score": float(score),
-                    "image_format": image_format,
-                    "image_size": f"{image.width}x{image.height}"
-                })
-                
-            except Exception as e:
-                results.append({
-                    "image_index": i,
-                    "error": f"Failed to process image: {str(e)}"
-                })
+                _check_base64_image(image_data, image_format)
+            except HTTPException as e:
+                rejected.append({"image_index": i, "error": e.detail})
+                continue
+            
+            jobs.append((i, image_format, image_data))
         
-        # Clean up temporary files
-        for temp_file in temp_files:
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
+        results = await _score_batch(jobs, _prepare_base64_image) + rejected
+        results.sort(key=lambda r: r["image_index"])
         
-        return JSONResponse({
+        return ORJSONResponse({
             "results": results,
             "total_images": len(images),
             "successful_images": len([r for r in results if "error" not in r]),
@@ -197,20 +570,12 @@ async def score_batch_images(
         })
         
     except Exception as e:
-        # Clean up temp files
-        for temp_file in temp_files:
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
-        
         raise HTTPException(status_code=500, detail=f"Error processing batch: {str(e)}")
 
-# Keep the file upload endpoints for backward compatibility
 @app.post("/score-file")
 async def score_image_file(file: UploadFile = File(...)):
     """
-    Upload an image file and get its aesthetic score (legacy endpoint)
+    Upload an image file and get its aesthetic score
     
     Args:
         file: Image file (JPEG, PNG, etc.)
@@ -222,38 +587,81 @@ async def score_image_file(file: UploadFile = File(...)):
         raise HTTPException(status_code=503, detail="Model not loaded")
     
     # Validate file type
-    if not file.content_type.startswith('image/'):
+    content_type = file.content_type or ""
+    if not content_type.startswith('image/'):
         raise HTTPException(status_code=400, detail="File must be an image")
     
     try:
-        # Create a temporary file to save the uploaded image
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as temp_file:
-            # Write the uploaded file content to the temporary file
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # Decode the uploaded content in memory, off the event loop
+        content = await file.read()
+        result = await run_in_threadpool(_score_sync, content, content_type.split('/')[-1])
         
-        # Get the aesthetic score
-        score = fa_model.aesthetic_score(temp_file_path)
-        
-        # Clean up the temporary file
-        os.unlink(temp_file_path)
-        
-        return JSONResponse({
+        return ORJSONResponse({
             "filename": file.filename,
-            "aesthetic_score": float(score),
+            **result,
             "message": "Image scored successfully"
         })
         
     except Exception as e:
-        # Clean up temp file if it exists
-        if 'temp_file_path' in locals():
-            try:
-                os.unlink(temp_file_path)
-            except:
-                pass
-        
         raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
 
+@app.post("/score-batch-file")
+async def score_batch_image_files(files: List[UploadFile] = File(...)):
+    """
+    Upload multiple image files and get aesthetic scores
+    
+    Args:
+        files: Image files (JPEG, PNG, etc.)
+    
+    Returns:
+        JSON with list of results for each image
+    """
+    if fa_model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    if len(files) == 0:
+        raise HTTPException(status_code=400, detail="No images provided")
+    
+    if len(files) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_BATCH_SIZE} images allowed per batch")
+    
+    try:
+        jobs = []
+        rejected = []
+        for i, file in enumerate(files):
+            content_type = file.content_type or ""
+            if not content_type.startswith('image/'):
+                rejected.append({"image_index": i, "error": "File must be an image"})
+                continue
+            
+            content = await file.read()
+            jobs.append((i, content_type.split('/')[-1], content))
+        
+        results = await _score_batch(jobs, _prepare_image) + rejected
+        results.sort(key=lambda r: r["image_index"])
+        for result in results:
+            result["filename"] = files[result["image_index"]].filename
+        
+        return ORJSONResponse({
+            "results": results,
+            "total_images": len(files),
+            "successful_images": len([r for r in results if "error" not in r]),
+            "message": "Batch scoring completed"
+        })
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing batch: {str(e)}")
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Each worker process loads its own model copy (500MB-1GB), so raise
+    # WORKERS only as far as memory allows. On GPU hosts run one worker per
+    # device (pin with CUDA_VISIBLE_DEVICES).
+    uvicorn.run(
+        "api:app",
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=int(os.environ.get("PORT", "8000")),
+        workers=_worker_count(),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning"
+    )
@@ -5,8 +5,10 @@ Shows how to integrate with the API from your service
 """
 
 import requests
-import base64
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 class FoodAestheticsClient:
@@ -14,11 +16,31 @@ class FoodAestheticsClient:
     
     def __init__(self, base_url="http://localhost:8000"):
         self.base_url = base_url
+        
+        # Reuse connections across calls (HTTP keep-alive)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.1)
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Close the underlying HTTP session"""
+        self.session.close()
     
     def health_check(self):
         """Check if the API is healthy"""
         try:
-            response = requests.get(f"{self.base_url}/health")
+            response = self.session.get(f"{self.base_url}/health")
             return response.status_code == 200, response.json()
         except Exception as e:
             return False, {"error": str(e)}
@@ -35,19 +57,15 @@ class FoodAestheticsClient:
             Tuple of (success, result)
         """
         try:
-            # Encode image to base64
+            # Stream the file straight from disk as the raw request body;
+            # requests reads it in chunks instead of building a multipart
+            # copy of the whole image in memory
             with open(image_path, 'rb') as f:
-                image_bytes = f.read()
-                image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-            
-            # Prepare payload
-            payload = {
-                "image_data": image_base64,
-                "image_format": image_format
-            }
-            
-            # Make API call
-            response = requests.post(f"{self.base_url}/score", json=payload)
+                response = self.session.post(
+                    f"{self.base_url}/score-raw",
+                    data=f,
+                    headers={'Content-Type': f'image/{image_format}'}
+                )
             
             if response.status_code == 200:
                 return True, response.json()
@@ -57,32 +75,32 @@ class FoodAestheticsClient:
         except Exception as e:
             return False, {"error": str(e)}
     
-    def score_images_batch(self, image_paths, image_format="jpeg"):
+    def _file_part(self, image_path, image_format):
+        """Build one multipart 'files' entry with the raw image bytes"""
+        image_path = Path(image_path)
+        return ('files', (image_path.name, image_path.read_bytes(), f'image/{image_format}'))
+    
+    def score_images_batch(self, image_paths, image_format="jpeg", max_workers=8):
         """
         Score multiple images in batch
         
         Args:
             image_paths: List of image file paths
             image_format: Image format (jpeg, png, etc.)
+            max_workers: Number of threads reading the image files
         
         Returns:
             Tuple of (success, result)
         """
         try:
-            # Prepare batch payload
-            images_payload = []
-            for img_path in image_paths:
-                with open(img_path, 'rb') as f:
-                    image_bytes = f.read()
-                    image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-                
-                images_payload.append({
-                    "image_data": image_base64,
-                    "image_format": image_format
-                })
+            # Read all images concurrently into the multipart batch payload
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                files = list(executor.map(
+                    lambda img_path: self._file_part(img_path, image_format), image_paths
+                ))
             
             # Make API call
-            response = requests.post(f"{self.base_url}/score-batch", json=images_payload)
+            response = self.session.post(f"{self.base_url}/score-batch-file", files=files)
             
             if response.status_code == 200:
                 return True, response.json()
@@ -96,7 +114,11 @@ def main():
     """Example usage of the client"""
     
     # Initialize client
-    client = FoodAestheticsClient()
+    with FoodAestheticsClient() as client:
+        run_examples(client)
+
+def run_examples(client):
+    """Run the example calls against the API"""
     
     print("🍽️ Food Aesthetics API Client Example")
     print("=" * 50)
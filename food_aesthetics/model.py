@@ -1,4 +1,5 @@
 import tensorflow as tf
+import io
 import numpy as np
 from PIL import Image
 import cv2 as cv
@@ -7,6 +8,8 @@ from tensorflow.keras.models import Model
 from tensorflow.keras.layers import Dense, Dropout
 from tensorflow.keras.applications.mobilenet import MobileNet
 
+# side of the square crop fed to the network
+INPUT_SIZE = 224
 
 class FoodAesthetics:
     def __init__(self):
@@ -16,10 +19,31 @@ class FoodAesthetics:
         self.__batch_size = 1
         self.temperature = 1.536936640739441
         self.model = NimaMobileNet(training=False)
-        self.model.build((self.__batch_size, 224, 224, 3))
+        self.model.build((self.__batch_size, INPUT_SIZE, INPUT_SIZE, 3))
         self.__home_path = Path(__file__).parent.resolve()
         self.model.load_weights(self.__home_path/'trained_weights.h5')
 
+        # traced once: uint8 batch -> normalize -> network -> softmax in a single graph
+        self._predict = tf.function(
+            self._forward,
+            input_signature=[tf.TensorSpec((None, INPUT_SIZE, INPUT_SIZE, 3), tf.uint8)]
+        )
+
+        # with a GPU, resizing runs on the device right after upload
+        self._on_gpu = len(tf.config.list_physical_devices('GPU')) > 0
+        self._resize_on_device = tf.function(
+            self._resize_tensor,
+            input_signature=[tf.TensorSpec((None, None, 3), tf.uint8)]
+        )
+
+    def warmup(self):
+        """
+        Run one dummy forward pass so graph tracing happens before the first real request.
+        """
+        self._predict(tf.zeros((1, INPUT_SIZE, INPUT_SIZE, 3), dtype=tf.uint8))
+        if self._on_gpu:
+            self._resize_on_device(tf.zeros((INPUT_SIZE, INPUT_SIZE, 3), dtype=tf.uint8))
+
     def aesthetic_score(self, path):
         """
         Compute aestehtic score of an image.
@@ -29,15 +53,118 @@ class FoodAesthetics:
         """
         
         photo = np.array(self._load_image(path))
-        photo = tf.image.random_crop(tf.convert_to_tensor(photo / 255, dtype=tf.float16), (224, 224, 3))
+        return self._score_photo(photo)
+
+    def aesthetic_score_bytes(self, buf):
+        """
+        Compute aesthetic score of an encoded image held in memory.
+
+        Input: bytes of the image file (JPEG, PNG, etc.).
+        Output: aesthetic score in range from 0 to 1.
+        """
+
+        return self.aesthetic_score(io.BytesIO(buf))
+
+    def aesthetic_score_from_array(self, array):
+        """
+        Compute aesthetic score of an already decoded image.
+
+        Input: H x W x 3 RGB uint8 array.
+        Output: aesthetic score in range from 0 to 1.
+        """
+
+        return self._score_photo(self.resize_array(array))
+
+    def aesthetic_score_batch(self, arrays):
+        """
+        Compute aesthetic scores of several decoded images in one forward pass.
+
+        Input: list of H x W x 3 RGB uint8 arrays.
+        Output: array of aesthetic scores in range from 0 to 1.
+        """
+
+        return self.aesthetic_score_resized([self.resize_array(array) for array in arrays])
+
+    def resize_array(self, array):
+        """
+        Resize a decoded image mantaining aspect ratio.
+
+        Uses the same antialiased bicubic filter as aesthetic_score. Scores
+        can still differ slightly from aesthetic_score(path) when the caller
+        decoded at a different scale (e.g. libjpeg-turbo scales by eighths,
+        PIL's draft only by powers of two). Always returns a new array.
+
+        Input: H x W x 3 RGB uint8 array.
+        Output: resized array (a GPU tensor when a GPU is available). Shortest side: 224 pixels.
+        """
+        if self._on_gpu:
+            return self._resize_on_device(array)
+
+        return np.asarray(self._resize_image(Image.fromarray(array)))
+
+    def _score_photo(self, photo):
+        """
+        Crop and score a resized photo.
+
+        Input: H x W x 3 RGB array, shortest side: 224 pixels.
+        Output: aesthetic score in range from 0 to 1.
+        """
+
+        return self.aesthetic_score_resized([photo]).item()
+
+    def aesthetic_score_resized(self, photos):
+        """
+        Crop and score resized photos as a single batch.
+
+        Input: list of H x W x 3 RGB arrays, shortest side: 224 pixels.
+        Output: array of aesthetic scores in range from 0 to 1.
+        """
+
+        # tf.stack keeps device-resized photos on the GPU
+        batch = tf.stack([self._random_crop(photo) for photo in photos])
         
         #photo = np.array(self._load_and_center_crop(path))
         #photo = tf.convert_to_tensor(photo / 255, dtype=tf.float16)
 
-        logits = self.model(tf.expand_dims(photo, axis = 0))
+        return self._predict(tf.cast(batch, tf.uint8)).numpy()
+
+    def _resize_tensor(self, image):
+        """
+        Antialiased bicubic resize on the default device (the GPU if present),
+        the same filter _resize_image applies with PIL.
+
+        Input: H x W x 3 uint8 tensor.
+        Output: resized uint8 tensor. Shortest side: 224 pixels.
+        """
+        size = tf.cast(tf.shape(image)[:2], tf.float32)
+        scale = INPUT_SIZE / tf.reduce_min(size)
+        new_size = tf.cast(tf.round(size * scale), tf.int32)
+        resized = tf.image.resize(image, new_size, method='bicubic', antialias=True)
+        return tf.cast(tf.clip_by_value(tf.round(resized), 0, 255), tf.uint8)
+
+    def _forward(self, batch):
+        """
+        Normalize a uint8 batch and compute aesthetic scores.
+
+        Input: N x 224 x 224 x 3 uint8 tensor.
+        Output: N scores in range from 0 to 1.
+        """
+        photos = tf.cast(batch, tf.float32) / 255
+        logits = self.model(photos, training=False)
         logits_scaled = tf.math.divide(logits, self.temperature)
-        score = tf.nn.softmax(logits_scaled).numpy()[:, 1].item()
-        return score
+        return tf.nn.softmax(logits_scaled)[:, 1]
+
+    def _random_crop(self, photo):
+        """
+        Random square crop of the network input size.
+
+        Input: H x W x 3 array, shortest side: 224 pixels.
+        Output: 224 x 224 x 3 array.
+        """
+        height, width = photo.shape[:2]
+        top = np.random.randint(0, height - INPUT_SIZE + 1)
+        left = np.random.randint(0, width - INPUT_SIZE + 1)
+        return photo[top:top + INPUT_SIZE, left:left + INPUT_SIZE]
 
 
     def _load_image(self, path):
@@ -48,14 +175,26 @@ class FoodAesthetics:
         Output: resized image. Shortest side: 224 pixels.
         """
         pic = Image.open(path)
+        # JPEGs: decode to RGB at the smallest scale still >= 224 pixels
+        pic.draft('RGB', (INPUT_SIZE, INPUT_SIZE))
         #pic = io.imread(path)
+        return self._resize_image(pic)
+
+    def _resize_image(self, pic):
+        """
+        Resize picture mantaining aspect ratio.
+
+        Input: PIL image.
+        Output: resized image. Shortest side: 224 pixels.
+        """
         width, height = pic.size
-        s = max(224/width, 224/height)
+        s = max(INPUT_SIZE/width, INPUT_SIZE/height)
 
+        # antialiased bicubic, matched by _resize_tensor on the GPU
         if width < height:
-            pic_res = pic.resize((224, round(s*height)))
+            pic_res = pic.resize((INPUT_SIZE, round(s*height)), Image.BICUBIC)
         else:
-            pic_res = pic.resize((round(s*width), 224))
+            pic_res = pic.resize((round(s*width), INPUT_SIZE), Image.BICUBIC)
 
         return pic_res
 
@@ -12,4 +12,13 @@ echo ""
 echo "Press Ctrl+C to stop the server"
 echo ""
 
-python api.py
+# Run uvicorn directly so the launcher process never imports the app;
+# each worker loads its own model copy (500MB-1GB)
+export WORKERS="${WORKERS:-1}"
+exec uvicorn api:app \
+    --host "${HOST:-0.0.0.0}" \
+    --port "${PORT:-8000}" \
+    --workers "$WORKERS" \
+    --loop uvloop \
+    --http httptools \
+    --log-level warning
@@ -1,50 +1,141 @@
 #!/usr/bin/env python3
 """
-Test script for the Food Aesthetics API with base64 image data
-Tests the new endpoints designed for Hugging Face Spaces and service-to-service calls
+Test script for the Food Aesthetics API scoring endpoints
+Uploads raw image bytes (/score-raw, /score-batch-file) by default; set USE_RAW=0
+to test the base64 endpoints (/score, /score-batch) used on Hugging Face Spaces
 """
 
-import requests
+import httpx
+import asyncio
+import contextvars
 import json
+import orjson
+import pybase64
 import base64
+import binascii
+import mmap
+import os
+import functools
+from itertools import islice
+import io
+import sys
+import contextlib
 from pathlib import Path
 
 # API base URL
 BASE_URL = "http://localhost:8000"
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Send raw image bytes to the raw/file endpoints; set USE_RAW=0 to exercise
+# the base64 endpoints (Hugging Face Spaces compatibility testing)
+USE_RAW = os.environ.get("USE_RAW", "1") != "0"
+UPLOAD_MODE = "raw bytes" if USE_RAW else "base64"
+
+# Chunk size for streaming raw request bodies
+CHUNK_SIZE = 64 * 1024
+
+# Largest base64 string the API accepts (api.MAX_BASE64_LENGTH)
+MAX_BASE64_LENGTH = 20 * 1024 * 1024
+
+# Model inference can take longer than httpx's 5s default
+TIMEOUT = 60.0
+
+# One pool shared by all concurrent tests
+LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+
+# Output buffer of the test running in the current asyncio task
+_test_output = contextvars.ContextVar("_test_output", default=None)
+
+class _TaskStdout(io.TextIOBase):
+    """stdout proxy that routes each concurrent test's prints to its own buffer"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+    
+    def write(self, text):
+        buffer = _test_output.get()
+        return (buffer if buffer is not None else self.stream).write(text)
+    
+    def flush(self):
+        self.stream.flush()
+
+def _iter_jpegs(dirpath):
+    """Yield JPEG test images lazily from a single directory scan"""
+    with os.scandir(dirpath) as entries:
+        for entry in entries:
+            if entry.name.lower().endswith(('.jpg', '.jpeg')):
+                yield Path(entry.path)
+
+@functools.lru_cache(maxsize=None)
+def _list_jpegs(dirpath):
+    """List all JPEG test images, once per run"""
+    return tuple(_iter_jpegs(dirpath))
+
+@functools.lru_cache(maxsize=None)
 def encode_image_to_base64(image_path):
-    """Convert image file to base64 string"""
+    """Convert image file to ASCII base64 bytes (cached, tests reuse the same images)"""
     with open(image_path, 'rb') as f:
-        image_bytes = f.read()
-        return base64.b64encode(image_bytes).decode('utf-8')
+        try:
+            # Encode straight from the page cache, no heap copy of the file
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return pybase64.b64encode(mm)
+        except ValueError:
+            # Empty files cannot be mapped
+            return pybase64.b64encode(f.read())
+
+def image_json(image_base64, image_format=b"jpeg"):
+    """
+    Build one {"image_data": ..., "image_format": ...} JSON object
+    
+    The schema is fixed and base64 needs no escaping, so plain byte
+    concatenation replaces a general JSON encoder.
+    """
+    return b'{"image_data":"' + image_base64 + b'","image_format":"' + image_format + b'"}'
+
+async def _iter_file(f):
+    """Stream an open file in chunks, reading off the event loop"""
+    while chunk := await asyncio.to_thread(f.read, CHUNK_SIZE):
+        yield chunk
 
-def test_health():
+def _decode(response):
+    """Parse a JSON response body with orjson"""
+    return orjson.loads(response.content)
+
+def decode_base64(data):
+    """Decode base64 with pybase64's validating SIMD path, falling back to the stdlib"""
+    try:
+        return pybase64.b64decode(data, validate=True)
+    except binascii.Error:
+        return base64.b64decode(data)
+
+async def test_health(client):
     """Test the health endpoint"""
     print("🔍 Testing health endpoint...")
     try:
-        response = requests.get(f"{BASE_URL}/health")
+        response = await client.get("/health")
         print(f"Status: {response.status_code}")
-        print(f"Response: {response.json()}")
+        print(f"Response: {_decode(response)}")
         return response.status_code == 200
     except Exception as e:
         print(f"❌ Error: {e}")
         return False
 
-def test_root():
+async def test_root(client):
     """Test the root endpoint"""
     print("\n🏠 Testing root endpoint...")
     try:
-        response = requests.get(f"{BASE_URL}/")
+        response = await client.get("/")
         print(f"Status: {response.status_code}")
-        print(f"Response: {response.json()}")
+        print(f"Response: {_decode(response)}")
         return response.status_code == 200
     except Exception as e:
         print(f"❌ Error: {e}")
         return False
 
-def test_single_image_base64():
-    """Test scoring a single image using base64 data"""
-    print("\n📸 Testing single image scoring with base64...")
+async def test_single_image(client):
+    """Test scoring a single image (raw bytes or base64, see USE_RAW)"""
+    print(f"\n📸 Testing single image scoring with {UPLOAD_MODE}...")
     
     # Check if we have test images
     images_dir = Path("./images")
@@ -53,7 +144,7 @@ def test_single_image_base64():
         return False
     
     # Find first JPEG image
-    image_files = list(images_dir.glob("*.jpeg")) + list(images_dir.glob("*.jpg"))
+    image_files = _list_jpegs(images_dir)
     if not image_files:
         print("❌ No JPEG images found in images directory")
         return False
@@ -62,21 +153,32 @@ def test_single_image_base64():
     print(f"Using test image: {test_image}")
     
     try:
-        # Encode image to base64
-        image_base64 = encode_image_to_base64(test_image)
-        
-        # Prepare request payload
-        payload = {
-            "image_data": image_base64,
-            "image_format": "jpeg"
-        }
-        
-        # Make API call
-        response = requests.post(f"{BASE_URL}/score", json=payload)
+        if USE_RAW:
+            # Stream the raw bytes as the request body, skipping base64 and
+            # multipart framing entirely
+            with open(test_image, 'rb') as f:
+                headers = {
+                    "Content-Type": "image/jpeg",
+                    "Content-Length": str(os.fstat(f.fileno()).st_size)
+                }
+                response = await client.post("/score-raw", content=_iter_file(f), headers=headers)
+        else:
+            # Encode image to base64 and check it round-trips, in worker
+            # threads so the concurrently running tests are not blocked
+            image_base64, image_bytes = await asyncio.gather(
+                asyncio.to_thread(encode_image_to_base64, test_image),
+                asyncio.to_thread(test_image.read_bytes)
+            )
+            if await asyncio.to_thread(decode_base64, image_base64) != image_bytes:
+                print("❌ Base64 round trip does not match the image file")
+                return False
+            
+            # Make API call
+            response = await client.post("/score", content=image_json(image_base64), headers=JSON_HEADERS)
         
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
-            result = response.json()
+            result = _decode(response)
             print(f"✅ Success! Aesthetic Score: {result['aesthetic_score']:.4f}")
             print(f"   Image Size: {result['image_size']}")
             print(f"   Format: {result['image_format']}")
@@ -90,9 +192,9 @@ def test_single_image_base64():
         print(f"❌ Error: {e}")
         return False
 
-def test_batch_images_base64():
-    """Test scoring multiple images using base64 data"""
-    print("\n🖼️ Testing batch image scoring with base64...")
+async def test_batch_images(client):
+    """Test scoring multiple images (raw bytes or base64, see USE_RAW)"""
+    print(f"\n🖼️ Testing batch image scoring with {UPLOAD_MODE}...")
     
     # Check if we have test images
     images_dir = Path("./images")
@@ -100,31 +202,39 @@ def test_batch_images_base64():
         print("❌ No images directory found")
         return False
     
-    # Find JPEG images (limit to 3 for testing)
-    image_files = list(images_dir.glob("*.jpeg")) + list(images_dir.glob("*.jpg"))
-    if not image_files:
+    # Find JPEG images (limit to 3 for testing), stopping the scan early
+    test_images = list(islice(_iter_jpegs(images_dir), 3))
+    if not test_images:
         print("❌ No JPEG images found in images directory")
         return False
     
-    test_images = image_files[:3]  # Limit to 3 images
     print(f"Using {len(test_images)} test images")
     
     try:
-        # Prepare batch payload
-        images_payload = []
-        for img_path in test_images:
-            image_base64 = encode_image_to_base64(img_path)
-            images_payload.append({
-                "image_data": image_base64,
-                "image_format": "jpeg"
-            })
-        
-        # Make API call
-        response = requests.post(f"{BASE_URL}/score-batch", json=images_payload)
+        if USE_RAW:
+            # Upload every image in one multipart request, streamed from the
+            # open files in chunks rather than read into memory first
+            with contextlib.ExitStack() as stack:
+                files = [
+                    ('files', (img_path.name, stack.enter_context(open(img_path, 'rb')), 'image/jpeg'))
+                    for img_path in test_images
+                ]
+                response = await client.post("/score-batch-file", files=files)
+        else:
+            # Encode all images concurrently in worker threads (pybase64 releases the GIL)
+            encoded = await asyncio.gather(
+                *[asyncio.to_thread(encode_image_to_base64, img_path) for img_path in test_images]
+            )
+            
+            # Prepare batch payload from the fixed JSON template
+            images_payload = b'[' + b','.join(image_json(image_base64) for image_base64 in encoded) + b']'
+            
+            # Make API call
+            response = await client.post("/score-batch", content=images_payload, headers=JSON_HEADERS)
         
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
-            result = response.json()
+            result = _decode(response)
             print(f"✅ Success! Processed {result['successful_images']}/{result['total_images']} images")
             for item in result['results']:
                 if "error" not in item:
@@ -141,7 +251,7 @@ def test_batch_images_base64():
         print(f"❌ Error: {e}")
         return False
 
-def test_legacy_file_upload():
+async def test_legacy_file_upload(client):
     """Test the legacy file upload endpoint for backward compatibility"""
     print("\n📁 Testing legacy file upload endpoint...")
     
@@ -150,7 +260,7 @@ def test_legacy_file_upload():
         print("❌ No images directory found")
         return False
     
-    image_files = list(images_dir.glob("*.jpeg")) + list(images_dir.glob("*.jpg"))
+    image_files = _list_jpegs(images_dir)
     if not image_files:
         print("❌ No JPEG images found in images directory")
         return False
@@ -159,13 +269,14 @@ def test_legacy_file_upload():
     print(f"Using test image: {test_image}")
     
     try:
+        # httpx streams the open file in chunks, no full copy in memory
         with open(test_image, 'rb') as f:
             files = {'file': (test_image.name, f, 'image/jpeg')}
-            response = requests.post(f"{BASE_URL}/score-file", files=files)
+            response = await client.post("/score-file", files=files)
         
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
-            result = response.json()
+            result = _decode(response)
             print(f"✅ Success! Aesthetic Score: {result['aesthetic_score']:.4f}")
             return True
         else:
@@ -177,10 +288,77 @@ def test_legacy_file_upload():
         print(f"❌ Error: {e}")
         return False
 
-def main():
+async def test_rejected_images(client):
+    """Test that oversize, mislabelled and malformed base64 images are refused"""
+    print("\n🚫 Testing rejected base64 images...")
+    
+    images_dir = Path("./images")
+    image_files = _list_jpegs(images_dir) if images_dir.exists() else ()
+    if not image_files:
+        print("❌ No JPEG images found in images directory")
+        return False
+    
+    try:
+        # Longer than the API's limit: refused before any decoding
+        oversize = b'A' * (MAX_BASE64_LENGTH + 4)
+        response = await client.post("/score", content=image_json(oversize), headers=JSON_HEADERS)
+        print(f"Oversize image: {response.status_code} (expected 413)")
+        passed = response.status_code == 413
+        
+        # JPEG bytes sent as a PNG
+        image_base64 = await asyncio.to_thread(encode_image_to_base64, image_files[0])
+        response = await client.post("/score", content=image_json(image_base64, b"png"), headers=JSON_HEADERS)
+        print(f"Mislabelled image: {response.status_code} (expected 415)")
+        passed = passed and response.status_code == 415
+        
+        # A malformed entry is reported per image, the rest of the batch still scores
+        images_payload = b'[' + image_json(image_base64) + b',{"image_data":null,"image_format":null}]'
+        response = await client.post("/score-batch", content=images_payload, headers=JSON_HEADERS)
+        print(f"Batch with a malformed entry: {response.status_code} (expected 200)")
+        if response.status_code == 200:
+            result = _decode(response)
+            print(f"   Processed {result['successful_images']}/{result['total_images']} images")
+            passed = passed and result['successful_images'] == 1 and "error" in result['results'][1]
+        else:
+            passed = False
+        
+        if passed:
+            print("✅ Invalid images rejected as expected")
+        return passed
+        
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+async def test_cache_stats(client):
+    """Test the score cache statistics endpoint"""
+    print("\n🗃️ Testing cache stats endpoint...")
+    try:
+        response = await client.get("/cache/stats")
+        print(f"Status: {response.status_code}")
+        if response.status_code != 200:
+            return False
+        
+        stats = _decode(response)
+        print(f"Response: {stats}")
+        return {"size", "maxsize", "hits", "misses", "hit_rate"} <= stats.keys()
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+async def _run_test(test_name, test_func, client):
+    """Run one test with its output captured in a task-local buffer"""
+    buffer = io.StringIO()
+    _test_output.set(buffer)
+    print(f"\n{'='*25} {test_name} {'='*25}")
+    result = await test_func(client)
+    return test_name, result, buffer.getvalue()
+
+async def main():
     """Run all tests"""
-    print("🧪 Food Aesthetics API Test Suite (Base64 Endpoints)")
+    print(f"🧪 Food Aesthetics API Test Suite ({UPLOAD_MODE.capitalize()} Endpoints)")
     print("=" * 60)
+    print(f"Upload mode: {'raw bytes (USE_RAW=1)' if USE_RAW else 'base64 JSON (USE_RAW=0)'}")
     
     # Make sure API is running
     print("⚠️  Make sure the API server is running (./start_api.sh)")
@@ -189,16 +367,28 @@ def main():
     tests = [
         ("Health Check", test_health),
         ("Root Endpoint", test_root),
-        ("Single Image Base64", test_single_image_base64),
-        ("Batch Images Base64", test_batch_images_base64),
-        ("Legacy File Upload", test_legacy_file_upload)
+        (f"Single Image {UPLOAD_MODE.capitalize()}", test_single_image),
+        (f"Batch Images {UPLOAD_MODE.capitalize()}", test_batch_images),
+        ("Legacy File Upload", test_legacy_file_upload),
+        ("Rejected Images", test_rejected_images),
+        ("Cache Stats", test_cache_stats)
     ]
     
+    # The tests are independent, so run them concurrently over one client
+    # and print each test's buffered output as one block, in order
+    # HTTP/2 is negotiated over TLS (e.g. a Spaces URL) and multiplexes the
+    # concurrent tests on one connection; plain http:// stays on HTTP/1.1
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=TIMEOUT, http2=True, limits=LIMITS) as client:
+        with contextlib.redirect_stdout(_TaskStdout(sys.stdout)):
+            outcomes = await asyncio.gather(
+                *[_run_test(test_name, test_func, client) for test_name, test_func in tests]
+            )
+    
     results = []
-    for test_name, test_func in tests:
-        print(f"\n{'='*25} {test_name} {'='*25}")
-        result = test_func()
+    for test_name, result, output in outcomes:
+        sys.stdout.write(output)
         results.append((test_name, result))
+    sys.stdout.flush()
     
     # Summary
     print(f"\n{'='*70}")
@@ -215,10 +405,10 @@ def main():
     print(f"\nOverall: {passed}/{total} tests passed")
     
     if passed == total:
-        print("🎉 All tests passed! API is working correctly with base64 endpoints.")
+        print(f"🎉 All tests passed! API is working correctly with {UPLOAD_MODE} endpoints.")
         print("\n🚀 Ready for Hugging Face Spaces deployment!")
     else:
         print("⚠️  Some tests failed. Check the API server and try again.")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())